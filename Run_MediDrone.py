@@ -4,11 +4,19 @@ import folium
 import random
 import time
 import plotly.express as px
+import numpy as np
+from session_manager import get_manager, keep_last
+from telemetry_udp import DEFAULT_HOST, DEFAULT_PORT, start_background
 
 # Page setup
 st.set_page_config(page_title="MediDrone Dashboard", layout="wide")
 st.title("🩺 MediDrone Interactive Dashboard")
 
+# One UDP telemetry receiver per server process, shared by every session
+@st.cache_resource
+def get_telemetry_store():
+    return start_background(DEFAULT_HOST, DEFAULT_PORT)
+
 # Sidebar module selection
 module = st.sidebar.selectbox("Select Module", [
     "AI Triage System & Drone Simulation",
@@ -18,6 +26,12 @@ module = st.sidebar.selectbox("Select Module", [
     "Smart Medicine Dispenser"
 ])
 
+# Keep long-lived sessions bounded: chat history is trimmed while Teleconsultation is idle
+state_manager = get_manager(st.session_state)
+state_manager.register("Teleconsultation", ["chat_history"], ttl_s=1800, compact={"chat_history": keep_last(200)})
+state_manager.touch(module)
+state_manager.sweep()
+
 # ---------------- AI TRIAGE & DRONE SIMULATION ----------------
 if module == "AI Triage System & Drone Simulation":
     st.subheader("AI Triage System & Drone Simulation")
@@ -48,10 +62,21 @@ if module == "AI Triage System & Drone Simulation":
 elif module == "Drone Bird Avoidance Simulation":
     st.subheader("🚁 Drone Bird Avoidance Simulation")
     
-    # Drone Telemetry Log
+    # Drone Telemetry Log (latest state per drone from the UDP feed)
     st.markdown("📋 Drone Telemetry Log")
-    for i in range(5):
-        st.write(f"Telemetry Entry {i+1}: Altitude {random.randint(50,150)}m, Speed {random.randint(20,50)} km/h")
+    try:
+        telemetry = get_telemetry_store().snapshot()
+    except OSError as exc:
+        # Not cached by st.cache_resource, so the bind is retried on the next rerun
+        st.error(f"Telemetry receiver could not bind udp://{DEFAULT_HOST}:{DEFAULT_PORT}: {exc}")
+        telemetry = {"drone_id": [], "age_s": []}
+    if len(telemetry["drone_id"]) == 0:
+        st.info(f"Waiting for telemetry on udp://{DEFAULT_HOST}:{DEFAULT_PORT} — "
+                "run `python telemetry_udp.py generate` for a local feed.")
+    for i in np.argsort(telemetry["age_s"])[:5]:
+        st.write(f"Drone {telemetry['drone_id'][i]}: Altitude {telemetry['alt_m'][i]:.0f}m, "
+                 f"Speed {telemetry['speed_kmh'][i]:.0f} km/h, Battery {telemetry['battery_pct'][i]}%, "
+                 f"Packets {telemetry['received'][i]} (lost {telemetry['lost'][i]})")
     
     # Control Panel
     st.sidebar.markdown("### Control Panel")
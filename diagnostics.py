@@ -4,6 +4,7 @@
 import streamlit as st
 import random
 import time
+from batch_diagnostics import analyze_sample
 
 def show_diagnostics():
     st.title("🧪 Diagnostic Lab - Point of Care Tests")
@@ -35,10 +36,13 @@ def show_diagnostics():
     if uploaded_file is not None:
         st.success(f"✅ Sample file received: {uploaded_file.name}")
         with st.spinner("Analyzing sample..."):
-            time.sleep(1.5)  # simulate processing delay
-            test_name = random.choice(list(outcomes.keys()))
-            result = random.choice(outcomes[test_name])
-            show_result(test_name, result)
+            try:
+                _, results = analyze_sample(uploaded_file.name, uploaded_file)
+            except Exception as exc:
+                st.error(f"❌ Could not analyze sample: {exc}")
+                results = []
+            for r in results:
+                show_result(r["test"], f"{r['result']} ({r['value']})")
 
     elif test_choice != "None":
         with st.spinner(f"Running {test_choice}..."):
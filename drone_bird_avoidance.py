@@ -1,39 +1,41 @@
 import streamlit as st
 import random
 import time
+from bird_vision import SyntheticCamera, BirdDetector
+from bird_tracking import BirdTracker, MANEUVERS, THREAT_LEVELS, classify_threat, detections_to_measurements
 
 # --- Initialize session state ---
 if "control_mode" not in st.session_state:
     st.session_state.control_mode = "AUTO"
 if "logs" not in st.session_state:
     st.session_state.logs = []
+if "camera" not in st.session_state:
+    st.session_state.camera = SyntheticCamera()
+    st.session_state.detector = BirdDetector()
+    st.session_state.detector.prime([st.session_state.camera.read()[0] for _ in range(15)])
+    st.session_state.tracker = BirdTracker(dt=1 / st.session_state.camera.fps)
 
 # --- Helper functions ---
 def detect_birds():
-    """Simulate AI bird detection with random chance"""
-    if random.random() < 0.3:  # 30% chance of bird appearing
-        distance = random.randint(5, 50)  # meters
-        return {"present": True, "distance": distance}
-    return {"present": False}
+    """Run the vision stage on the next camera frame and return the most threatening tracked bird"""
+    frame, _ = st.session_state.camera.read()
+    detections = st.session_state.detector.detect(frame)
+    z, R = detections_to_measurements(detections)
+    st.session_state.tracker.step(z, R=R)
+    return st.session_state.tracker.most_threatening()
 
 def assess_threat(bird):
-    """Decide threat level based on distance"""
+    """Decide threat level from time-to-closest-approach and miss distance"""
     if not bird["present"]:
         return "NONE"
-    if bird["distance"] > 20:
-        return "MONITOR"
-    elif bird["distance"] > 10:
-        return "AVOID"
-    else:
-        return "EMERGENCY"
+    level = classify_threat(bird["distance"], bird["tcpa"], bird["miss_distance"])
+    return str(THREAT_LEVELS[int(level)])
 
 def plan_maneuver(level):
     """Pick avoidance maneuver"""
-    options = {
-        "AVOID": random.choice(["Climb +2m", "Sidestep Right", "Hover"]),
-        "EMERGENCY": random.choice(["Abort Mission", "Return-To-Home", "Descend Rapidly"]),
-    }
-    return options.get(level, "Continue Mission")
+    if level in MANEUVERS:
+        return random.choice(MANEUVERS[level])
+    return "Continue Mission"
 
 def log_event(event):
     st.session_state.logs.append(f"[{time.strftime('%H:%M:%S')}] {event}")
@@ -67,17 +69,17 @@ if st.button("Run Simulation Step"):
             log_event("No bird detected — continuing mission")
             st.info("AUTO: No bird detected. Drone continues mission.")
         elif threat == "MONITOR":
-            log_event(f"Bird detected at safe distance ({bird['distance']}m). Monitoring.")
-            st.warning(f"AUTO: Bird detected at {bird['distance']}m — monitoring.")
+            log_event(f"Bird detected at safe distance ({bird['distance']}m, bearing {bird['bearing']}°). Monitoring.")
+            st.warning(f"AUTO: Bird detected at {bird['distance']}m, bearing {bird['bearing']}° — monitoring.")
         elif threat == "AVOID":
             maneuver = plan_maneuver("AVOID")
-            log_event(f"Bird nearby ({bird['distance']}m) — executing avoidance: {maneuver}")
+            log_event(f"Bird nearby ({bird['distance']}m, bearing {bird['bearing']}°) — executing avoidance: {maneuver}")
             st.error(f"AUTO: Avoidance maneuver triggered → {maneuver}")
             if play_sound:
                 st.write("🔊 Sound deterrent activated")
         elif threat == "EMERGENCY":
             maneuver = plan_maneuver("EMERGENCY")
-            log_event(f"EMERGENCY! Bird very close ({bird['distance']}m) — {maneuver}")
+            log_event(f"EMERGENCY! Bird very close ({bird['distance']}m, bearing {bird['bearing']}°) — {maneuver}")
             st.error(f"AUTO: EMERGENCY action → {maneuver}")
             if play_sound:
                 st.write("🔊 Sound deterrent activated (emergency)")
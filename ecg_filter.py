@@ -0,0 +1,110 @@
+# ecg_filter.py
+"""
+Streaming ECG conditioning stage
+- Band-pass (Butterworth) + optional mains notch, as second-order sections
+- scipy.signal.sosfilt applied chunk by chunk, carrying the zi state between
+  chunks/reruns so there are no edge transients at chunk boundaries
+- Vectorized across patients: chunks are (n_patients, n_samples) arrays
+"""
+
+import numpy as np
+from scipy.signal import butter, iirnotch, sosfilt, sosfilt_zi, tf2sos
+
+NOTCH_OPTIONS = {"Off": None, "50 Hz": 50.0, "60 Hz": 60.0}
+
+
+def clamp_band(fs, band, min_hz=0.01):
+    """Band edges clamped into (0, 0.95 * Nyquist); None if nothing usable is left (low >= high)"""
+    edge = 0.95 * fs / 2.0
+    low, high = (min(max(float(f), min_hz), edge) for f in band)
+    return (low, high) if low < high else None
+
+
+def design_sos(fs, band=(0.5, 40.0), notch_hz=None, order=2, notch_q=30.0):
+    """SOS cascade: band-pass, then notch if notch_hz is set and below Nyquist"""
+    nyq = fs / 2.0
+    clamped = clamp_band(fs, band)
+    if clamped is None:
+        raise ValueError(f"band {tuple(band)} Hz is empty once clamped below 0.95 * Nyquist ({0.95 * nyq:g} Hz)")
+    sos = butter(order, clamped, btype="bandpass", fs=fs, output="sos")
+    if notch_hz and notch_hz < nyq:
+        b, a = iirnotch(notch_hz, notch_q, fs=fs)
+        sos = np.vstack([sos, tf2sos(b, a)])
+    return sos
+
+
+class StreamingFilter:
+    """sosfilt with persistent per-channel state; feed consecutive chunks to process()"""
+
+    def __init__(self, sos, n_channels=1, config=None):
+        self.sos = np.asarray(sos, dtype=float)
+        self.n_channels = n_channels
+        self.config = config
+        self._zi_unit = sosfilt_zi(self.sos)          # (n_sections, 2) step response state
+        self.zi = None
+
+    def reset(self):
+        self.zi = None
+
+    def process(self, chunk):
+        """Filter a (n_samples,) or (n_channels, n_samples) chunk, continuing from the last call"""
+        x = np.asarray(chunk, dtype=float)
+        one_d = x.ndim == 1
+        x = np.atleast_2d(x)
+        if x.shape[0] != self.n_channels:
+            raise ValueError(f"expected {self.n_channels} channels, got {x.shape[0]}")
+        if x.shape[1] == 0:
+            return x[0] if one_d else x
+        if self.zi is None:
+            # Start in steady state for the first sample of each channel (no startup transient)
+            self.zi = self._zi_unit[:, None, :] * x[:, 0][None, :, None]
+        y, self.zi = sosfilt(self.sos, x, axis=-1, zi=self.zi)
+        return y[0] if one_d else y
+
+
+def cached_filter(store, key, fs, band, notch_hz, n_channels=1):
+    """Fetch the page's filter from store (e.g. st.session_state), rebuilding it when settings change.
+
+    Returns None (and drops any stored filter) when the band is empty at this fs.
+    """
+    band = clamp_band(fs, band)
+    if band is None:
+        store.pop(key, None)
+        return None
+    config = (fs, band, notch_hz, n_channels)
+    current = store.get(key)
+    if current is None or current.config != config:
+        current = StreamingFilter(design_sos(fs, band, notch_hz), n_channels, config=config)
+        store[key] = current
+    return current
+
+
+def run_benchmark(n_patients=64, fs=250, chunk_sizes=(32, 64, 128, 256, 512, 1024, 2048), repeats=200, seed=0):
+    """Per-chunk cost for each chunk size; us/sample should stay roughly flat (linear cost)"""
+    import time
+
+    rng = np.random.default_rng(seed)
+    rows = []
+    for size in chunk_sizes:
+        filt = StreamingFilter(design_sos(fs, notch_hz=50.0), n_channels=n_patients)
+        chunk = rng.normal(size=(n_patients, size))
+        filt.process(chunk)
+        start = time.perf_counter()
+        for _ in range(repeats):
+            filt.process(chunk)
+        per_chunk = (time.perf_counter() - start) / repeats
+        rows.append({"chunk": size, "us_per_chunk": round(per_chunk * 1e6, 1),
+                     "ns_per_sample": round(per_chunk / (size * n_patients) * 1e9, 2)})
+    return rows
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark the streaming ECG filter")
+    parser.add_argument("--patients", type=int, default=64)
+    parser.add_argument("--fs", type=int, default=250)
+    args = parser.parse_args()
+    print(f"{'chunk':>6} {'us/chunk':>10} {'ns/sample':>10}")
+    for row in run_benchmark(args.patients, args.fs):
+        print(f"{row['chunk']:>6} {row['us_per_chunk']:>10} {row['ns_per_sample']:>10}")
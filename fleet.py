@@ -0,0 +1,108 @@
+# fleet.py
+"""
+Live fleet positions for the triage map
+- Drones follow their planned polylines from mission start time at constant speed
+- All drones are interpolated at once from stacked (N, V, 2) route arrays
+- positions_geojson() serialises the whole drone layer; streamlit-folium replaces
+  that layer wholesale on every push (it has no per-feature update), so there is
+  no moved-only delta
+"""
+
+import numpy as np
+
+EARTH_RADIUS_M = 6371000.0
+PHASES = ["Taking Off", "En Route", "Delivered", "Returning", "Completed ✅"]
+
+
+def _to_metres(lat, lon, lat0):
+    """Local equirectangular projection (plenty for city-scale routes)"""
+    y = np.radians(lat) * EARTH_RADIUS_M
+    x = np.radians(lon) * EARTH_RADIUS_M * np.cos(np.radians(lat0))
+    return x, y
+
+
+class Fleet:
+    """Stacked polyline routes with start times and speeds"""
+
+    def __init__(self, routes, start_times, speeds, ids=None):
+        n = len(routes)
+        v = max(2, max(len(r) for r in routes))
+        # Pad every route to v vertices by repeating its last point (zero-length segments)
+        self.vertices = np.empty((n, v, 2))
+        for i, route in enumerate(routes):
+            route = np.asarray(route, dtype=float).reshape(-1, 2)
+            self.vertices[i, :len(route)] = route
+            self.vertices[i, len(route):] = route[-1]
+        self.lat0 = float(self.vertices[:, :, 0].mean())
+        x, y = _to_metres(self.vertices[..., 0], self.vertices[..., 1], self.lat0)
+        seg = np.hypot(np.diff(x, axis=1), np.diff(y, axis=1))
+        self.cum = np.concatenate([np.zeros((n, 1)), np.cumsum(seg, axis=1)], axis=1)
+        self.total = self.cum[:, -1]
+        self.start_times = np.asarray(start_times, dtype=float)
+        self.speeds = np.asarray(speeds, dtype=float)
+        self.ids = np.arange(n) if ids is None else np.asarray(ids)
+        self._rows = np.arange(n)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def distance_flown(self, t):
+        return np.clip((t - self.start_times) * self.speeds, 0.0, self.total)
+
+    def progress(self, t):
+        """Fraction of each route completed at time t (0..1)"""
+        return np.divide(self.distance_flown(t), self.total, out=np.ones(len(self)), where=self.total > 0)
+
+    def positions(self, t):
+        """(N, 2) lat/lon of every drone at time t"""
+        d = self.distance_flown(t)
+        v = self.vertices.shape[1]
+        seg = np.clip((self.cum <= d[:, None]).sum(axis=1) - 1, 0, v - 2)
+        c0 = self.cum[self._rows, seg]
+        length = self.cum[self._rows, seg + 1] - c0
+        frac = np.divide(d - c0, length, out=np.zeros_like(d), where=length > 0)
+        p0 = self.vertices[self._rows, seg]
+        p1 = self.vertices[self._rows, seg + 1]
+        return p0 + frac[:, None] * (p1 - p0)
+
+
+def flight_status(fraction, delivered_at=0.5):
+    """Map out-and-back route progress onto the dashboard's status phases"""
+    if fraction <= 0.0:
+        return PHASES[0]
+    if fraction >= 1.0:
+        return PHASES[4]
+    if fraction < delivered_at - 0.02:
+        return PHASES[1] if fraction > 0.02 else PHASES[0]
+    if fraction <= delivered_at + 0.02:
+        return PHASES[2]
+    return PHASES[3]
+
+
+def positions_geojson(ids, coords):
+    """Compact GeoJSON FeatureCollection of drone points (coords are lat/lon rows); the full layer, every call"""
+    return {
+        "type": "FeatureCollection",
+        "features": [
+            {"type": "Feature", "id": int(i),
+             "geometry": {"type": "Point", "coordinates": [round(float(lon), 6), round(float(lat), 6)]},
+             "properties": {"drone": int(i)}}
+            for i, (lat, lon) in zip(ids, coords)
+        ],
+    }
+
+
+def demo_fleet(base, n_drones=200, radius_km=4.0, speed_ms=(10.0, 18.0), stagger_s=120.0,
+               t0=0.0, first_route=None, seed=0):
+    """Out-and-back delivery routes from base to random patients; drone 0 flies first_route if given"""
+    rng = np.random.default_rng(seed)
+    base = np.asarray(base, dtype=float)
+    deg = radius_km / 111.0
+    patients = base + rng.uniform(-deg, deg, size=(n_drones, 2))
+    routes = [[base, p, base] for p in patients]
+    starts = t0 + rng.uniform(0, stagger_s, n_drones)
+    if first_route is not None:
+        routes[0] = first_route
+        starts[0] = t0
+    speeds = rng.uniform(*speed_ms, n_drones)
+    return Fleet(routes, starts, speeds)
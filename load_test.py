@@ -0,0 +1,262 @@
+# load_test.py
+"""
+Concurrent-session load test for the dashboard scripts
+- Starts ONE `streamlit run` server per N and drives it with N websocket clients
+  speaking Streamlit's own BackMsg/ForwardMsg protocol, so sessions share the
+  server's interpreter, GIL, st.cache_resource and module-level caches
+- Each session picks a sidebar module, pokes its widgets, then reruns the
+  script repeatedly the way st_autorefresh / fragments would
+- Reports rerun latency percentiles (send -> script_finished), server CPU time/
+  utilisation, server RSS and RSS growth per session for each N, and appends the
+  curve to a CSV so versions can be compared
+- Server CPU/RSS are read from /proc (Linux); memory is measured after one warm-up
+  session has paid the import cost
+
+Usage:
+    python load_test.py medidrone.py --sessions 1 2 4 8 16 --reruns 20 --label v1.2
+"""
+
+import asyncio
+import csv
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+import numpy as np
+
+RESULT_FIELDS = ["label", "script", "sessions", "reruns", "p50_ms", "p95_ms", "p99_ms", "max_ms",
+                 "errors", "wall_s", "cpu_s", "cpu_util", "server_rss_mb", "mem_per_session_kb"]
+
+SIDEBAR = 1   # root container index of st.sidebar in a delta path
+FINISHED_OK = 0
+
+
+# -------------------------
+# Server process
+# -------------------------
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(script, port, timeout=60):
+    """Launch `streamlit run` headless and wait for its health endpoint"""
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", script, "--server.headless", "true",
+         "--server.port", str(port), "--server.address", "127.0.0.1",
+         "--browser.gatherUsageStats", "false", "--server.fileWatcherType", "none"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"streamlit exited with code {proc.returncode}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1) as r:
+                if r.status == 200:
+                    return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError(f"streamlit did not come up on port {port} within {timeout}s")
+
+
+def server_usage(pid):
+    """(cpu seconds, rss bytes) of the server process from /proc"""
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    cpu = (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    with open(f"/proc/{pid}/statm") as f:
+        rss = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    return cpu, rss
+
+
+# -------------------------
+# Websocket session
+# -------------------------
+class Session:
+    """One browser tab: keeps widget values between reruns like the frontend does"""
+
+    def __init__(self, ws, rng, timeout):
+        self.ws = ws
+        self.rng = rng
+        self.timeout = timeout
+        self.values = {}      # widget id -> WidgetState sent on every rerun
+        self.widgets = []     # (delta path, element type, element proto) from the last run
+        self.latencies = []
+        self.errors = 0
+
+    async def rerun(self, triggers=()):
+        """Send rerun_script with the current widget states; wait for script_finished"""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        msg = BackMsg()
+        msg.rerun_script.query_string = ""
+        msg.rerun_script.widget_states.widgets.extend(list(self.values.values()) + list(triggers))
+        widgets = []
+        start = time.perf_counter()
+        try:
+            await self.ws.send(msg.SerializeToString())
+            while True:
+                fwd = ForwardMsg()
+                fwd.ParseFromString(await asyncio.wait_for(self.ws.recv(), self.timeout))
+                kind = fwd.WhichOneof("type")
+                if kind == "delta" and fwd.delta.WhichOneof("type") == "new_element":
+                    element = fwd.delta.new_element
+                    etype = element.WhichOneof("type")
+                    if etype == "exception":
+                        self.errors += 1
+                    elif etype in ("selectbox", "slider", "checkbox", "button"):
+                        widgets.append((tuple(fwd.metadata.delta_path), etype, getattr(element, etype)))
+                elif kind == "script_finished":
+                    if fwd.script_finished != FINISHED_OK:
+                        self.errors += 1
+                    break
+        except Exception:
+            # Timeouts and dropped connections never produce an exception element; count them too
+            self.errors += 1
+        self.latencies.append(time.perf_counter() - start)
+        self.widgets = widgets or self.widgets
+
+    def pick_module(self):
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        for path, etype, w in self.widgets:
+            if etype == "selectbox" and path and path[0] == SIDEBAR and len(w.options):
+                self.values[w.id] = WidgetState(id=w.id, string_value=self.rng.choice(list(w.options)))
+                return True
+        return False
+
+    def interact(self):
+        """Change one random widget on the current page; returns one-shot triggers (button clicks)"""
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        candidates = [(etype, w) for _, etype, w in self.widgets
+                      if not (etype == "slider" and (len(w.options) or w.data_type > 1)) and etype != "selectbox"]
+        if not candidates:
+            return ()
+        etype, w = self.rng.choice(candidates)
+        if etype == "button":
+            return (WidgetState(id=w.id, trigger_value=True),)
+        state = WidgetState(id=w.id)
+        if etype == "checkbox":
+            current = self.values.get(w.id)
+            state.bool_value = not (current.bool_value if current else w.default)
+        else:
+            lo, hi = w.min, w.max
+            value = self.rng.randint(int(lo), int(hi)) if w.data_type == 0 else self.rng.uniform(lo, hi)
+            state.double_array_value.data.extend(sorted([value, value][:len(w.default) or 1]))
+        self.values[w.id] = state
+        return ()
+
+
+async def run_session(url, reruns, seed, timeout=60):
+    """One operator session over a websocket: returns (rerun latencies in seconds, error count)"""
+    from websockets.asyncio.client import connect
+
+    session = None
+    try:
+        async with connect(url, subprotocols=["streamlit"], max_size=None, open_timeout=timeout) as ws:
+            session = Session(ws, random.Random(seed), timeout)
+            await session.rerun()
+            if session.pick_module():
+                await session.rerun()
+            for i in range(reruns):
+                # Every few ticks the operator touches a widget; otherwise it's a plain autorefresh rerun
+                await session.rerun(session.interact() if i % 4 == 0 else ())
+            return session.latencies, session.errors
+    except Exception:
+        if session is None:
+            return [], reruns + 2
+        return session.latencies, session.errors + 1
+
+
+def measure(script, sessions, reruns, seed=0, label="", timeout=60):
+    """Run `sessions` concurrent websocket sessions against one server and summarise latency, CPU, memory"""
+    port = _free_port()
+    url = f"ws://127.0.0.1:{port}/_stcore/stream"
+    proc = start_server(script, port, timeout)
+    try:
+        # Warm-up session: imports, st.cache_resource and module caches are paid once, outside the numbers
+        asyncio.run(run_session(url, 2, seed - 1, timeout))
+        cpu0, rss0 = server_usage(proc.pid)
+        wall0 = time.perf_counter()
+
+        async def all_sessions():
+            return await asyncio.gather(*(run_session(url, reruns, seed + i, timeout) for i in range(sessions)))
+
+        results = asyncio.run(all_sessions())
+        wall = time.perf_counter() - wall0
+        cpu1, rss1 = server_usage(proc.pid)
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+    lat = np.concatenate([np.asarray(r[0], dtype=float) for r in results] + [np.zeros(0)]) * 1000.0
+    p50, p95, p99 = np.percentile(lat, [50, 95, 99]) if len(lat) else (np.nan,) * 3
+    cpu = cpu1 - cpu0
+    return {
+        "label": label,
+        "script": os.path.basename(script),
+        "sessions": sessions,
+        "reruns": reruns,
+        "p50_ms": round(float(p50), 1),
+        "p95_ms": round(float(p95), 1),
+        "p99_ms": round(float(p99), 1),
+        "max_ms": round(float(lat.max()), 1) if len(lat) else float("nan"),
+        "errors": sum(r[1] for r in results),
+        "wall_s": round(wall, 2),
+        "cpu_s": round(cpu, 2),
+        "cpu_util": round(cpu / wall, 2) if wall else 0.0,
+        "server_rss_mb": round(rss1 / 2 ** 20, 1),
+        "mem_per_session_kb": round(max(rss1 - rss0, 0) / sessions / 1024, 1),
+    }
+
+
+def _git_label():
+    try:
+        return subprocess.run(["git", "describe", "--always", "--dirty"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def append_results(path, rows):
+    new = not os.path.exists(path) or os.path.getsize(path) == 0
+    with open(path, "a", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS)
+        if new:
+            writer.writeheader()
+        writer.writerows(rows)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Concurrent-session load test for a Streamlit dashboard")
+    parser.add_argument("script", nargs="?", default="medidrone.py")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--reruns", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--label", default=None, help="version label for the curve (default: git describe)")
+    parser.add_argument("--out", default="load_test_results.csv")
+    args = parser.parse_args()
+
+    label = args.label or _git_label()
+    rows = []
+    print(f"{'N':>4} {'p50':>8} {'p95':>8} {'p99':>8} {'cpu%':>6} {'RSS MB':>7} {'kB/sess':>9} {'err':>4}")
+    for n in args.sessions:
+        row = measure(args.script, n, args.reruns, args.seed, label)
+        rows.append(row)
+        print(f"{n:>4} {row['p50_ms']:>8} {row['p95_ms']:>8} {row['p99_ms']:>8} "
+              f"{row['cpu_util'] * 100:>6.0f} {row['server_rss_mb']:>7} {row['mem_per_session_kb']:>9} {row['errors']:>4}")
+    append_results(args.out, rows)
+    print(f"appended {len(rows)} rows to {args.out} (label {label})")
@@ -1,7 +1,5 @@
 # medi.py
 import streamlit as st
-import folium
-from streamlit_folium import st_folium
 import time
 import random
 import numpy as np
@@ -9,6 +7,13 @@ from scipy.signal import convolve
 from collections import deque
 import plotly.graph_objects as go
 from streamlit_autorefresh import st_autorefresh
+from bird_vision import SyntheticCamera, BirdDetector
+from batch_diagnostics import analyze_sample
+from triage import init_fleet, show_fleet_map
+from ecg_filter import NOTCH_OPTIONS, cached_filter
+from session_manager import get_manager, keep_last
+from vitals_alarms import AlarmEngine
+from bird_tracking import BirdTracker, MANEUVERS, THREAT_LEVELS, classify_threat, detections_to_measurements
 
 # ✅ Page setup
 st.set_page_config(page_title="MediDrone AI System", layout="wide", page_icon="🚁")
@@ -30,20 +35,8 @@ def show_triage():
     patient = [12.9750, 77.6050]
     end = [12.9716, 77.5946]
 
-    m = folium.Map(location=start, zoom_start=14)
-    folium.Marker(start, tooltip="Drone Base", icon=folium.Icon(color="green")).add_to(m)
-    folium.Marker(patient, tooltip="Patient", icon=folium.Icon(color="red")).add_to(m)
-    folium.Marker(end, tooltip="Return Base", icon=folium.Icon(color="blue")).add_to(m)
-    folium.PolyLine([start, patient, end], color="purple", weight=5, opacity=0.8).add_to(m)
-    st_folium(m, width=700, height=400)
-
-    st.subheader("Drone Flight Status")
-    steps = ["Taking Off", "En Route", "Delivered", "Returning"]
-    status_text = st.empty()
-    for step in steps:
-        status_text.text(f"Drone Status: {step}")
-        time.sleep(1.2)
-    status_text.text("Drone Status: Completed ✅")
+    init_fleet(start, patient, end)
+    show_fleet_map()
 
 
 # ------------------------------
@@ -54,29 +47,29 @@ def show_bird_avoidance():
         st.session_state.control_mode = "AUTO"
     if "logs" not in st.session_state:
         st.session_state.logs = []
+    if "camera" not in st.session_state:
+        st.session_state.camera = SyntheticCamera()
+        st.session_state.detector = BirdDetector()
+        st.session_state.detector.prime([st.session_state.camera.read()[0] for _ in range(15)])
+        st.session_state.tracker = BirdTracker(dt=1 / st.session_state.camera.fps)
 
     def detect_birds():
-        if random.random() < 0.3:
-            distance = random.randint(5, 50)
-            return {"present": True, "distance": distance}
-        return {"present": False}
+        frame, _ = st.session_state.camera.read()
+        detections = st.session_state.detector.detect(frame)
+        z, R = detections_to_measurements(detections)
+        st.session_state.tracker.step(z, R=R)
+        return st.session_state.tracker.most_threatening()
 
     def assess_threat(bird):
         if not bird["present"]:
             return "NONE"
-        if bird["distance"] > 20:
-            return "MONITOR"
-        elif bird["distance"] > 10:
-            return "AVOID"
-        else:
-            return "EMERGENCY"
+        level = classify_threat(bird["distance"], bird["tcpa"], bird["miss_distance"])
+        return str(THREAT_LEVELS[int(level)])
 
     def plan_maneuver(level):
-        options = {
-            "AVOID": random.choice(["Climb +2m", "Sidestep Right", "Hover"]),
-            "EMERGENCY": random.choice(["Abort Mission", "Return-To-Home", "Descend Rapidly"]),
-        }
-        return options.get(level, "Continue Mission")
+        if level in MANEUVERS:
+            return random.choice(MANEUVERS[level])
+        return "Continue Mission"
 
     def log_event(event):
         st.session_state.logs.append(f"[{time.strftime('%H:%M:%S')}] {event}")
@@ -105,17 +98,17 @@ def show_bird_avoidance():
                 log_event("No bird detected — continuing mission")
                 st.info("AUTO: No bird detected. Drone continues mission.")
             elif threat == "MONITOR":
-                log_event(f"Bird detected at {bird['distance']}m — monitoring")
-                st.warning(f"AUTO: Bird detected at {bird['distance']}m — monitoring.")
+                log_event(f"Bird detected at {bird['distance']}m, bearing {bird['bearing']}° — monitoring")
+                st.warning(f"AUTO: Bird detected at {bird['distance']}m, bearing {bird['bearing']}° — monitoring.")
             elif threat == "AVOID":
                 maneuver = plan_maneuver("AVOID")
-                log_event(f"Bird nearby ({bird['distance']}m) — executing {maneuver}")
+                log_event(f"Bird nearby ({bird['distance']}m, bearing {bird['bearing']}°) — executing {maneuver}")
                 st.error(f"AUTO: Avoidance maneuver → {maneuver}")
                 if play_sound:
                     st.write("🔊 Sound deterrent activated")
             elif threat == "EMERGENCY":
                 maneuver = plan_maneuver("EMERGENCY")
-                log_event(f"EMERGENCY! Bird very close ({bird['distance']}m) — {maneuver}")
+                log_event(f"EMERGENCY! Bird very close ({bird['distance']}m, bearing {bird['bearing']}°) — {maneuver}")
                 st.error(f"AUTO: EMERGENCY action → {maneuver}")
                 if play_sound:
                     st.write("🔊 Sound deterrent activated (emergency)")
@@ -152,10 +145,13 @@ def show_diagnostics():
     if uploaded_file is not None:
         st.success(f"✅ Sample file received: {uploaded_file.name}")
         with st.spinner("Analyzing sample..."):
-            time.sleep(1.5)
-            test_name = random.choice(list(outcomes.keys()))
-            result = random.choice(outcomes[test_name])
-            show_result(test_name, result)
+            try:
+                _, results = analyze_sample(uploaded_file.name, uploaded_file)
+            except Exception as exc:
+                st.error(f"❌ Could not analyze sample: {exc}")
+                results = []
+            for r in results:
+                show_result(r["test"], f"{r['result']} ({r['value']})")
     elif test_choice != "None":
         with st.spinner(f"Running {test_choice}..."):
             time.sleep(1.5)
@@ -217,6 +213,9 @@ def show_vitals():
         noise = st.slider("ECG Noise Level", 0.0, 0.05, 0.01, step=0.001)
         spo2_base = st.slider("SpO₂ Baseline (%)", 85, 100, 97)
         temp_base = st.slider("Temperature Baseline (°C)", 35.0, 39.0, 36.6, step=0.1)
+        filter_ecg = st.checkbox("Filter ECG", value=True)
+        filter_band = st.slider("ECG Band-pass (Hz)", 0.1, 60.0, (0.5, 40.0), step=0.1)
+        notch = st.selectbox("Mains Notch", list(NOTCH_OPTIONS), index=1)
         run = st.checkbox("Run Simulation", value=True)
 
     with col2:
@@ -224,6 +223,7 @@ def show_vitals():
         ecg_placeholder = st.empty()
         colm1, colm2, colm3 = st.columns(3)
         spo2_metric, temp_metric, hr_metric = colm1.empty(), colm2.empty(), colm3.empty()
+        alarm_placeholder = st.container()
 
     def make_beat_template(fs=250):
         t = np.linspace(-0.5, 0.8, int(1.3 * fs), endpoint=False)
@@ -251,6 +251,12 @@ def show_vitals():
 
     if run:
         ecg_chunk = generate_ecg(hr, fs, noise)
+        if filter_ecg:
+            band_filter = cached_filter(st.session_state, "medidrone_ecg_filter", fs, filter_band, NOTCH_OPTIONS[notch])
+            if band_filter is None:
+                st.warning(f"ECG band {filter_band[0]}–{filter_band[1]} Hz is not usable at {fs} Hz sampling; showing unfiltered ECG.")
+            else:
+                ecg_chunk = band_filter.process(ecg_chunk)
         for s in ecg_chunk:
             st.session_state.ecg_buffer.append(s)
         t_vals = np.linspace(-buffer_seconds, 0, len(st.session_state.ecg_buffer))
@@ -276,6 +282,21 @@ def show_vitals():
     temp_metric.metric("Temp (°C)", f"{st.session_state.temp:.2f}")
     hr_metric.metric("HR (bpm)", f"{hr}")
 
+    if "alarm_engine" not in st.session_state:
+        st.session_state.alarm_engine = AlarmEngine(n_patients=1)
+        st.session_state.alarm_log = deque(maxlen=20)
+    latest = [[hr, st.session_state.spo2, st.session_state.temp]]
+    events = st.session_state.alarm_engine.evaluate(time.time(), latest, baseline=[[hr, spo2_base, temp_base]])
+    for e in events:
+        st.session_state.alarm_log.append(f"[{time.strftime('%H:%M:%S')}] {e['event']} {e['rule']} ({e['value']})")
+        if e["event"] == "RAISE":
+            st.toast(f"🚨 {e['rule']} ({e['value']})")
+    with alarm_placeholder:
+        for name, severity in st.session_state.alarm_engine.active_alarms(0):
+            (st.error if severity == "critical" else st.warning)(f"🚨 {name}")
+        for entry in reversed(st.session_state.alarm_log):
+            st.caption(entry)
+
 
 # ------------------------------
 # 6️⃣ MEDICINE DISPENSER MODULE
@@ -310,6 +331,25 @@ option = st.sidebar.selectbox(
     ]
 )
 
+def _pinned_alarms(state):
+    """Keep the alarm engine (and its log) while any alarm is active; releasing it would drop them"""
+    if "alarm_engine" in state and state["alarm_engine"].active.any():
+        return ("alarm_engine", "alarm_log")
+    return ()
+
+# Release/compact state owned by modules the operator is not using
+state_manager = get_manager(st.session_state)
+state_manager.register("Triage", ["fleet", "fleet_map"], ttl_s=300)
+# Only rebuildable state is registered: operator settings such as control_mode are never released
+state_manager.register("Bird Avoidance", ["logs", "camera", "detector", "tracker"],
+                       ttl_s=600, compact={"logs": keep_last(100)})
+state_manager.register("Vitals Monitoring", ["vitals_init", "fs", "buffer_seconds", "ecg_buffer", "time_buffer",
+                                             "spo2", "temp", "last_update", "medidrone_ecg_filter",
+                                             "alarm_engine", "alarm_log"], ttl_s=120, pin=_pinned_alarms)
+state_manager.touch(option)
+state_manager.sweep()
+st.sidebar.caption(f"Session state: {state_manager.last_report['total_bytes'] / 1024:.0f} kB")
+
 if option == "Triage":
     show_triage()
 elif option == "Bird Avoidance":
@@ -0,0 +1,158 @@
+# mission_sim.py
+"""
+Headless Monte Carlo mission risk simulator for the bird-avoidance policy
+- Missions are simulated in vectorized chunks (route length, bird density, encounters)
+- Each encounter is classified with the tracker's TCPA/miss-distance rule and
+  resolved with the same maneuver policy the dashboards use (MANEUVERS)
+- Chunks run across a process pool; every chunk has its own SeedSequence child,
+  so results depend only on the seed, not on worker count or completion order
+- Partial aggregates stream back as chunks finish
+
+Usage:
+    python mission_sim.py --missions 1000000 --workers 8 --seed 42
+"""
+
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from bird_tracking import MANEUVERS, classify_threat, closest_approach, polar_to_xy
+
+TERMINAL = {"Abort Mission": "aborts", "Return-To-Home": "rth"}
+COUNT_KEYS = ("missions", "metres", "encounters", "avoid", "emergency", "aborts", "rth")
+
+
+# -------------------------
+# One chunk of missions
+# -------------------------
+def simulate_chunk(n_missions, seed, route_km=(2.0, 10.0), birds_per_km=0.5,
+                   drone_speed=12.0, bird_speed_std=5.0):
+    """Simulate n_missions and return summed counts (no per-mission data leaves the worker)"""
+    rng = np.random.default_rng(seed)
+    length = rng.uniform(route_km[0], route_km[1], n_missions)
+    n_enc = rng.poisson(birds_per_km * length)
+    total = int(n_enc.sum())
+
+    # Encounters flattened across missions, ordered by position along each route
+    mission = np.repeat(np.arange(n_missions), n_enc)
+    pos_km = rng.random(total) * length[mission]
+    order = np.lexsort((pos_km, mission))
+    mission, pos_km = mission[order], pos_km[order]
+
+    rel_pos = polar_to_xy(rng.uniform(5, 50, total), rng.uniform(-45, 45, total))
+    rel_vel = rng.normal(0, bird_speed_std, (total, 2))
+    rel_vel[:, 0] -= drone_speed
+    tcpa, miss = closest_approach(rel_pos, rel_vel)
+    level = classify_threat(np.linalg.norm(rel_pos, axis=1), tcpa, miss)
+
+    # Policy: uniform choice among the maneuvers for that level
+    emergency = MANEUVERS["EMERGENCY"]
+    choice = rng.integers(0, len(emergency), total)
+    terminal_kind = np.full(total, -1)
+    for i, name in enumerate(emergency):
+        if name in TERMINAL:
+            terminal_kind[(level == 2) & (choice == i)] = i
+
+    # First terminal encounter ends the mission; later encounters never happen
+    term_idx = np.flatnonzero(terminal_kind >= 0)
+    term_mission, first = np.unique(mission[term_idx], return_index=True)
+    term_idx = term_idx[first]
+    flown = length.copy()
+    flown[term_mission] = pos_km[term_idx]
+    cutoff = np.full(n_missions, np.inf)
+    cutoff[term_mission] = pos_km[term_idx]
+    happened = pos_km <= cutoff[mission]
+
+    counts = {
+        "missions": n_missions,
+        # Integer metres keep the cross-chunk sum exact regardless of completion order
+        "metres": int(round(flown.sum() * 1000)),
+        "encounters": int(happened.sum()),
+        "avoid": int(((level == 1) & happened).sum()),
+        "emergency": int(((level == 2) & happened).sum()),
+    }
+    kinds = terminal_kind[term_idx]
+    for i, name in enumerate(emergency):
+        if name in TERMINAL:
+            counts[TERMINAL[name]] = int((kinds == i).sum())
+    return counts
+
+
+# -------------------------
+# Aggregation
+# -------------------------
+def _proportion_ci(k, n, z=1.96):
+    """Wilson score interval for a binomial proportion"""
+    if n == 0:
+        return (float("nan"), float("nan"))
+    p = k / n
+    denom = 1 + z * z / n
+    centre = (p + z * z / (2 * n)) / denom
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return (centre - half, centre + half)
+
+
+def summarize(counts):
+    """Rates with 95% confidence intervals from summed chunk counts"""
+    n, km = counts["missions"], counts["metres"] / 1000
+    rate = counts["encounters"] / km if km else float("nan")
+    half = 1.96 * math.sqrt(counts["encounters"]) / km if km else float("nan")
+    return {
+        "missions": n,
+        "km_flown": round(km, 1),
+        "abort_rate": counts["aborts"] / n if n else float("nan"),
+        "abort_rate_ci": _proportion_ci(counts["aborts"], n),
+        "rth_rate": counts["rth"] / n if n else float("nan"),
+        "rth_rate_ci": _proportion_ci(counts["rth"], n),
+        "encounters_per_km": rate,
+        "encounters_per_km_ci": (rate - half, rate + half),
+        "avoid_per_km": counts["avoid"] / km if km else float("nan"),
+        "emergency_per_km": counts["emergency"] / km if km else float("nan"),
+    }
+
+
+def run(missions, seed=0, workers=None, chunk_size=100_000, **params):
+    """Yield (completed_chunks, total_chunks, summary) as chunk results stream back"""
+    n_chunks = math.ceil(missions / chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+    sizes = [min(chunk_size, missions - i * chunk_size) for i in range(n_chunks)]
+    totals = dict.fromkeys(COUNT_KEYS, 0)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(simulate_chunk, size, s, **params) for size, s in zip(sizes, seeds)]
+        for done, future in enumerate(as_completed(futures), start=1):
+            for key, value in future.result().items():
+                totals[key] += value
+            yield done, n_chunks, summarize(totals)
+
+
+if __name__ == "__main__":
+    import argparse
+    import os
+
+    parser = argparse.ArgumentParser(description="Monte Carlo bird-avoidance mission risk simulator")
+    parser.add_argument("--missions", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    parser.add_argument("--route-km", type=float, nargs=2, default=(2.0, 10.0), metavar=("MIN", "MAX"))
+    parser.add_argument("--birds-per-km", type=float, default=0.5)
+    args = parser.parse_args()
+    if args.missions < 1:
+        parser.error("--missions must be at least 1")
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be at least 1")
+
+    start = time.perf_counter()
+    summary = None
+    for done, total, summary in run(args.missions, args.seed, args.workers, args.chunk_size,
+                                    route_km=tuple(args.route_km), birds_per_km=args.birds_per_km):
+        print(f"[{done}/{total}] missions={summary['missions']:,} "
+              f"abort={summary['abort_rate']:.4f} rth={summary['rth_rate']:.4f} "
+              f"enc/km={summary['encounters_per_km']:.4f}")
+    elapsed = time.perf_counter() - start
+    print()
+    for key, value in summary.items():
+        print(f"{key:>22}: {value}")
+    print(f"{'missions_per_s':>22}: {summary['missions'] / elapsed:,.0f} ({args.workers} workers)")
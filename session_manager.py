@@ -0,0 +1,180 @@
+# session_manager.py
+"""
+Per-module session-state lifecycle and memory accounting
+- Each dashboard module registers the st.session_state keys it owns, an idle TTL
+  and optional per-key compaction functions (e.g. keep the last 100 log lines)
+- Every rerun the active module is touched; inactive modules are compacted,
+  and released entirely once idle longer than their TTL (except keys the module
+  currently pins, e.g. an alarm engine with active alarms)
+- A per-session byte budget releases least-recently-used inactive modules first
+- Size estimates are reported per module, per session and across the server; the
+  server view aggregates the snapshot each session records at the end of its sweep
+"""
+
+import sys
+import time
+import weakref
+from collections import deque
+
+MANAGER_KEY = "_state_manager"
+DEFAULT_BUDGET_BYTES = 8 * 1024 * 1024
+
+# All live managers in this server process (entries vanish when a session's state is freed).
+# Each manager holds its own session's state object, never the st.session_state proxy.
+_SESSIONS = weakref.WeakValueDictionary()
+
+
+def estimate_bytes(obj, _seen=None, _depth=0):
+    """Approximate deep size: NumPy nbytes, containers sampled, objects via __dict__"""
+    if _seen is None:
+        _seen = set()
+    if id(obj) in _seen or _depth > 6:
+        return 0
+    _seen.add(id(obj))
+    nbytes = getattr(obj, "nbytes", None)
+    if isinstance(nbytes, int):
+        return max(nbytes, sys.getsizeof(obj))
+    size = sys.getsizeof(obj, 0)
+    if isinstance(obj, (str, bytes, int, float, bool, type(None))):
+        return size
+    if isinstance(obj, dict):
+        items = list(obj.items())
+        return size + _sampled(items, lambda kv: estimate_bytes(kv[0], _seen, _depth + 1) + estimate_bytes(kv[1], _seen, _depth + 1))
+    if isinstance(obj, (list, tuple, set, frozenset, deque)):
+        return size + _sampled(list(obj), lambda item: estimate_bytes(item, _seen, _depth + 1))
+    if hasattr(obj, "__dict__"):
+        return size + estimate_bytes(vars(obj), _seen, _depth + 1)
+    return size
+
+
+def _sampled(items, sizer, limit=256):
+    """Exact for small containers; extrapolate from evenly spaced samples for large ones"""
+    n = len(items)
+    if n <= limit:
+        return sum(sizer(item) for item in items)
+    step = n / limit
+    sample = [items[int(i * step)] for i in range(limit)]
+    return int(sum(sizer(item) for item in sample) * n / limit)
+
+
+def keep_last(n):
+    """Compaction helper: keep only the newest n entries of a list/deque"""
+    def compact(value):
+        if isinstance(value, deque):
+            return deque(list(value)[-n:], maxlen=value.maxlen)
+        return value[-n:]
+    return compact
+
+
+class SessionStateManager:
+    """Tracks which session_state keys belong to which module and when each was last active"""
+
+    def __init__(self, state, session_id=None, budget_bytes=DEFAULT_BUDGET_BYTES):
+        self._state = state
+        self.session_id = session_id
+        self.budget_bytes = budget_bytes
+        self.modules = {}
+        self.active = None
+        self.last_report = None
+
+    def register(self, module, keys, ttl_s=300.0, compact=None, pin=None):
+        """Declare module-owned keys; compact maps key -> function(value) -> smaller value.
+
+        Only register state the module can rebuild; operator settings should stay unregistered.
+        pin is function(state) -> keys that must survive release right now.
+        """
+        entry = self.modules.setdefault(module, {"keys": set(), "ttl_s": ttl_s, "compact": {}, "pin": None,
+                                                 "last_used": time.time()})
+        entry["keys"].update(keys)
+        entry["ttl_s"] = ttl_s
+        entry["compact"].update(compact or {})
+        entry["pin"] = pin or entry["pin"]
+
+    def touch(self, module):
+        self.active = module
+        if module in self.modules:
+            self.modules[module]["last_used"] = time.time()
+
+    def _compact(self, module):
+        for key, fn in self.modules[module]["compact"].items():
+            if key in self._state:
+                self._state[key] = fn(self._state[key])
+
+    def release(self, module):
+        entry = self.modules[module]
+        pinned = set(entry["pin"](self._state)) if entry["pin"] else set()
+        for key in entry["keys"] - pinned:
+            if key in self._state:
+                del self._state[key]
+
+    def sweep(self, now=None):
+        """Compact inactive modules, release expired ones, enforce the byte budget, record a report"""
+        now = time.time() if now is None else now
+        for module, entry in self.modules.items():
+            if module == self.active:
+                continue
+            if now - entry["last_used"] > entry["ttl_s"]:
+                self.release(module)
+            else:
+                self._compact(module)
+
+        if self.total_bytes() > self.budget_bytes:
+            if self.active in self.modules:
+                self._compact(self.active)
+            idle = sorted((m for m in self.modules if m != self.active), key=lambda m: self.modules[m]["last_used"])
+            for module in idle:
+                if self.total_bytes() <= self.budget_bytes:
+                    break
+                self.release(module)
+        self.last_report = self.report()
+
+    def module_bytes(self):
+        """Estimated bytes currently held by each registered module"""
+        return {
+            module: sum(estimate_bytes(self._state[k]) for k in entry["keys"] if k in self._state)
+            for module, entry in self.modules.items()
+        }
+
+    def total_bytes(self):
+        return sum(self.module_bytes().values())
+
+    def report(self):
+        per_module = self.module_bytes()
+        return {"session": self.session_id, "total_bytes": sum(per_module.values()),
+                "budget_bytes": self.budget_bytes, "modules": per_module}
+
+
+def _session_state(state):
+    """Unwrap st.session_state to the calling session's own state; other mappings pass through.
+
+    The proxy resolves to whichever session is running the current thread, so a manager
+    keeping it would read another session's keys (or nothing, outside a script thread).
+    """
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        from streamlit.runtime.state import SessionStateProxy
+    except ImportError:
+        return state, None
+    ctx = get_script_run_ctx()
+    if isinstance(state, SessionStateProxy):
+        if ctx is None:
+            raise RuntimeError("get_manager(st.session_state) must be called from a Streamlit script thread")
+        return ctx.session_state, ctx.session_id
+    return state, ctx.session_id if ctx else None
+
+
+def get_manager(state, budget_bytes=DEFAULT_BUDGET_BYTES):
+    """The session's manager, created on first use and registered for server-wide reporting"""
+    state, session_id = _session_state(state)
+    if MANAGER_KEY not in state:
+        session_id = session_id or str(id(state))
+        manager = SessionStateManager(state, session_id, budget_bytes)
+        state[MANAGER_KEY] = manager
+        _SESSIONS[id(manager)] = manager
+    return state[MANAGER_KEY]
+
+
+def server_report():
+    """Per-session totals for every live session, as of each session's last sweep (safe from any thread)"""
+    reports = [m.last_report for m in list(_SESSIONS.values()) if m.last_report is not None]
+    return {"sessions": len(reports), "total_bytes": sum(r["total_bytes"] for r in reports), "per_session": reports}
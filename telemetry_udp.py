@@ -0,0 +1,322 @@
+# telemetry_udp.py
+"""
+Binary drone telemetry ingestion over UDP
+- Fixed 40-byte little-endian packets (MAVLink-like), described by a NumPy structured dtype
+- Non-blocking socket (large SO_RCVBUF) drained on the asyncio loop with recv_into
+  straight into a preallocated batch buffer; each flush parses the whole batch with
+  one np.frombuffer (no per-field unpacking, no per-datagram bytes objects)
+- Latest state per drone is kept in arrays indexed by drone_id and published to the
+  dashboard; a late packet never overwrites a newer sequence number
+- Ships with a local packet generator and a throughput benchmark
+
+Usage:
+    python telemetry_udp.py serve
+    python telemetry_udp.py generate --drones 50 --rate 20000
+    python telemetry_udp.py bench --seconds 10
+"""
+
+import asyncio
+import socket
+import threading
+import time
+
+import numpy as np
+
+DEFAULT_HOST, DEFAULT_PORT = "127.0.0.1", 14550
+MAGIC = 0xFD
+VERSION = 1
+MAX_DRONES = 65536
+MAX_DATAGRAM = 65536        # > largest UDP payload, so recv_into never truncates
+RCVBUF_BYTES = 32 * 1024 * 1024
+
+PACKET_DTYPE = np.dtype([
+    ("magic", "u1"),
+    ("version", "u1"),
+    ("drone_id", "<u2"),
+    ("seq", "<u4"),
+    ("time_us", "<u8"),
+    ("lat_e7", "<i4"),          # degrees * 1e7
+    ("lon_e7", "<i4"),
+    ("alt_mm", "<i4"),
+    ("vx_cms", "<i2"),          # cm/s, north/east/down
+    ("vy_cms", "<i2"),
+    ("vz_cms", "<i2"),
+    ("heading_cdeg", "<u2"),    # centidegrees
+    ("battery_pct", "u1"),
+    ("status", "u1"),
+    ("checksum", "<u2"),        # sum of the preceding 38 bytes, mod 2**16
+])
+PACKET_SIZE = PACKET_DTYPE.itemsize   # 40
+
+
+def checksums(raw):
+    """Vectorized checksum for an (n, PACKET_SIZE) uint8 view"""
+    return raw[:, :PACKET_SIZE - 2].sum(axis=1, dtype=np.uint32).astype(np.uint16)
+
+
+# -------------------------
+# Latest-state store
+# -------------------------
+class TelemetryStore:
+    """Latest packet per drone plus receive counters; batches are applied under a lock"""
+
+    def __init__(self, max_drones=MAX_DRONES):
+        self.latest = np.zeros(max_drones, dtype=PACKET_DTYPE)
+        self.seen = np.zeros(max_drones, dtype=bool)
+        self.received = np.zeros(max_drones, dtype=np.int64)
+        self.lost = np.zeros(max_drones, dtype=np.int64)
+        self.last_rx = np.zeros(max_drones)
+        self.packets = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def apply(self, batch, rejected=0):
+        """Fold a parsed batch into the per-drone arrays"""
+        now = time.time()
+        with self._lock:
+            self.packets += len(batch)
+            self.rejected += rejected
+            if not len(batch):
+                return
+            order = np.lexsort((batch["seq"], batch["drone_id"]))
+            ordered = batch[order]
+            ids = ordered["drone_id"]
+            last = np.r_[ids[1:] != ids[:-1], True]
+            first = np.r_[True, ids[1:] != ids[:-1]]
+            uids, counts = ids[last], np.diff(np.r_[0, np.flatnonzero(last) + 1])
+            # Sequence gaps since the previous batch (ignores 32-bit wraparound)
+            prev = self.seen[uids]
+            expected = ordered["seq"][last].astype(np.int64) - np.where(
+                prev, self.latest["seq"][uids].astype(np.int64), ordered["seq"][first].astype(np.int64) - 1)
+            self.lost[uids] += np.maximum(expected - counts, 0)
+            self.received[uids] += counts
+            # Out-of-order delivery: only move a drone forward if this batch has a newer seq
+            newer = ~prev | (ordered["seq"][last] > self.latest["seq"][uids])
+            self.latest[uids[newer]] = ordered[last][newer]
+            self.seen[uids] = True
+            self.last_rx[uids] = now
+
+    def snapshot(self):
+        """Dashboard-ready latest state for every drone seen so far"""
+        with self._lock:
+            ids = np.flatnonzero(self.seen)
+            rec = self.latest[ids].copy()
+            received, lost, last_rx = self.received[ids], self.lost[ids], self.last_rx[ids]
+        return {
+            "drone_id": ids,
+            "seq": rec["seq"],
+            "lat": rec["lat_e7"] / 1e7,
+            "lon": rec["lon_e7"] / 1e7,
+            "alt_m": rec["alt_mm"] / 1000.0,
+            "speed_kmh": np.hypot(rec["vx_cms"], rec["vy_cms"]) * 0.036,
+            "heading_deg": rec["heading_cdeg"] / 100.0,
+            "battery_pct": rec["battery_pct"],
+            "received": received,
+            "lost": lost,
+            "age_s": time.time() - last_rx,
+        }
+
+
+# -------------------------
+# asyncio receiver
+# -------------------------
+class TelemetryReceiver:
+    """Drains a non-blocking UDP socket into a bytearray batch; flush() parses the batch in one NumPy call"""
+
+    def __init__(self, store, sock, batch_packets=4096, flush_ms=20, max_reads=1024):
+        self.store = store
+        self.sock = sock
+        self.batch_bytes = batch_packets * PACKET_SIZE
+        self.flush_s = flush_ms / 1000.0
+        self.max_reads = max_reads
+        # Headroom for one full datagram past the batch size
+        self._buf = bytearray(self.batch_bytes + MAX_DATAGRAM)
+        self._view = memoryview(self._buf)
+        self._fill = 0
+        self._malformed = 0
+        self._flush_handle = None
+        self.loop = asyncio.get_running_loop()
+
+    def on_readable(self):
+        """Read every queued datagram (bounded by max_reads so the loop is not starved)"""
+        recv_into, view = self.sock.recv_into, self._view
+        for _ in range(self.max_reads):
+            try:
+                n = recv_into(view[self._fill:], MAX_DATAGRAM)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError:
+                self._malformed += 1
+                continue
+            # One datagram may carry several back-to-back packets; a bad length is simply not kept
+            if n == 0 or n % PACKET_SIZE:
+                self._malformed += 1
+                continue
+            self._fill += n
+            if self._fill >= self.batch_bytes:
+                self.flush()
+        if self._fill and self._flush_handle is None:
+            self._flush_handle = self.loop.call_later(self.flush_s, self.flush)
+
+    def flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        count = self._fill // PACKET_SIZE
+        if count == 0 and not self._malformed:
+            return
+        raw = np.frombuffer(self._buf, dtype=np.uint8, count=count * PACKET_SIZE).reshape(count, PACKET_SIZE)
+        batch = raw.view(PACKET_DTYPE).reshape(count)
+        ok = (batch["magic"] == MAGIC) & (batch["version"] == VERSION) & (batch["checksum"] == checksums(raw))
+        # Copy out the valid rows before the buffer is reused
+        self.store.apply(batch[ok], rejected=int((~ok).sum()) + self._malformed)
+        self._fill = 0
+        self._malformed = 0
+
+
+def open_socket(host=DEFAULT_HOST, port=DEFAULT_PORT, rcvbuf=RCVBUF_BYTES):
+    """Bound, non-blocking UDP socket with a large kernel receive buffer (capped by net.core.rmem_max)"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, rcvbuf)
+    sock.bind((host, port))
+    sock.setblocking(False)
+    return sock
+
+
+async def serve(store, host=DEFAULT_HOST, port=DEFAULT_PORT, stop=None, sock=None, **receiver_kwargs):
+    """Receive until `stop` (an asyncio.Event) is set, or forever; uses `sock` if already bound"""
+    loop = asyncio.get_running_loop()
+    sock = sock or open_socket(host, port)
+    receiver = TelemetryReceiver(store, sock, **receiver_kwargs)
+    loop.add_reader(sock.fileno(), receiver.on_readable)
+    try:
+        if stop is None:
+            await asyncio.Future()
+        else:
+            await stop.wait()
+    finally:
+        loop.remove_reader(sock.fileno())
+        receiver.on_readable()
+        receiver.flush()
+        sock.close()
+
+
+def start_background(host=DEFAULT_HOST, port=DEFAULT_PORT, store=None):
+    """Run the receiver on its own event loop thread; returns the store it publishes into.
+
+    The socket is bound here, in the caller's thread, so a port already in use raises
+    OSError to the caller instead of killing the background thread silently.
+    """
+    sock = open_socket(host, port)
+    store = store or TelemetryStore()
+    thread = threading.Thread(target=lambda: asyncio.run(serve(store, sock=sock)), daemon=True)
+    thread.start()
+    return store
+
+
+# -------------------------
+# Local packet generator
+# -------------------------
+def encode_packets(drone_ids, seqs, base=(12.9716, 77.5946), t=None, rng=None):
+    """Build packets for the given drones as one contiguous bytes object"""
+    rng = rng or np.random.default_rng()
+    t = time.time() if t is None else t
+    n = len(drone_ids)
+    pkt = np.zeros(n, dtype=PACKET_DTYPE)
+    pkt["magic"], pkt["version"] = MAGIC, VERSION
+    pkt["drone_id"], pkt["seq"] = drone_ids, seqs
+    pkt["time_us"] = int(t * 1e6)
+    angle = (t / 60.0 + drone_ids / 7.0) % (2 * np.pi)
+    pkt["lat_e7"] = ((base[0] + 0.01 * np.sin(angle)) * 1e7).astype(np.int32)
+    pkt["lon_e7"] = ((base[1] + 0.01 * np.cos(angle)) * 1e7).astype(np.int32)
+    pkt["alt_mm"] = rng.integers(50_000, 150_000, n)
+    pkt["vx_cms"] = rng.integers(-1400, 1400, n)
+    pkt["vy_cms"] = rng.integers(-1400, 1400, n)
+    pkt["heading_cdeg"] = (np.degrees(angle) * 100).astype(np.uint16)
+    pkt["battery_pct"] = rng.integers(20, 100, n)
+    raw = pkt.view(np.uint8).reshape(n, PACKET_SIZE)
+    pkt["checksum"] = checksums(raw)
+    return pkt.tobytes()
+
+
+def run_generator(host=DEFAULT_HOST, port=DEFAULT_PORT, n_drones=50, rate=20_000,
+                  packets_per_datagram=1, duration=None):
+    """Send `rate` packets/s round-robin over n_drones (rate <= 0 means as fast as possible)"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    rng = np.random.default_rng()
+    seq = np.zeros(n_drones, dtype=np.uint32)
+    chunk = max(1, n_drones // packets_per_datagram) * packets_per_datagram
+    sent, start = 0, time.perf_counter()
+    try:
+        while duration is None or time.perf_counter() - start < duration:
+            ids = np.arange(sent, sent + chunk) % n_drones
+            seqs = seq[ids]
+            seq[ids] += 1
+            payload = encode_packets(ids.astype(np.uint16), seqs, rng=rng)
+            step = PACKET_SIZE * packets_per_datagram
+            for off in range(0, len(payload), step):
+                sock.sendto(payload[off:off + step], (host, port))
+            sent += chunk
+            if rate > 0:
+                ahead = sent / rate - (time.perf_counter() - start)
+                if ahead > 0:
+                    time.sleep(ahead)
+    finally:
+        sock.close()
+    return sent
+
+
+def run_benchmark(seconds=10.0, n_drones=100, packets_per_datagram=1, port=DEFAULT_PORT + 1):
+    """Receiver on this process's event loop, generator flat out in a child process"""
+    import multiprocessing
+
+    store = TelemetryStore()
+
+    async def main():
+        stop = asyncio.Event()
+        server = asyncio.create_task(serve(store, DEFAULT_HOST, port, stop))
+        await asyncio.sleep(0.2)
+        sender = multiprocessing.Process(target=run_generator,
+                                         args=(DEFAULT_HOST, port, n_drones, 0, packets_per_datagram, seconds))
+        cpu0, t0 = time.process_time(), time.perf_counter()
+        sender.start()
+        await asyncio.get_running_loop().run_in_executor(None, sender.join)
+        await asyncio.sleep(0.1)
+        stop.set()
+        await server
+        return time.process_time() - cpu0, time.perf_counter() - t0
+
+    cpu, wall = asyncio.run(main())
+    snap = store.snapshot()
+    return {
+        "packets": store.packets,
+        "rejected": store.rejected,
+        "lost_estimate": int(snap["lost"].sum()),
+        "packets_per_s": round(store.packets / wall),
+        "receiver_cpu_util": round(cpu / wall, 2),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="UDP drone telemetry ingestion")
+    parser.add_argument("command", choices=["serve", "generate", "bench"])
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--drones", type=int, default=50)
+    parser.add_argument("--rate", type=int, default=20_000, help="packets/s for generate (0 = unthrottled)")
+    parser.add_argument("--per-datagram", type=int, default=1)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        store = start_background(args.host, args.port)
+        while True:
+            time.sleep(1.0)
+            print(f"packets={store.packets} rejected={store.rejected} drones={int(store.seen.sum())}")
+    elif args.command == "generate":
+        run_generator(args.host, args.port, args.drones, args.rate, args.per_datagram)
+    else:
+        for key, value in run_benchmark(args.seconds, args.drones, args.per_datagram).items():
+            print(f"{key:>18}: {value}")
@@ -0,0 +1,16 @@
+import os
+
+from batch_diagnostics import generate_samples, run_batch
+
+
+def test_rerun_skips_done_files_and_ignores_own_report(tmp_path, monkeypatch):
+    root = tmp_path / "s"
+    generate_samples(str(root), 12)
+    monkeypatch.chdir(tmp_path)
+    report = os.path.join("s", "report.csv")
+
+    processed, skipped, errors, _ = run_batch("s", report=report, workers=2)
+    assert (processed, skipped, errors) == (12, 0, 0)
+    # Same directory spelled differently, report now present under root
+    processed, skipped, errors, _ = run_batch("./s", report=report, workers=2)
+    assert (processed, skipped, errors) == (0, 12, 0)
@@ -0,0 +1,33 @@
+import numpy as np
+
+from bird_tracking import THREAT_LEVELS, BirdTracker, classify_threat
+
+
+def _level(bird):
+    return str(THREAT_LEVELS[int(classify_threat(bird["distance"], bird["tcpa"], bird["miss_distance"]))])
+
+
+def test_new_close_bird_outranks_confirmed_distant_track():
+    tracker = BirdTracker()
+    far = np.array([[45.0, 0.0]])
+    for _ in range(5):
+        tracker.step(far)
+    assert _level(tracker.most_threatening()) == "MONITOR"
+
+    # A bird appears at 4 m: still tentative for the next ticks, but must be EMERGENCY at once
+    for _ in range(2):
+        tracker.step(np.array([[45.0, 0.0], [4.0, 0.0]]))
+        bird = tracker.most_threatening()
+        assert not bird["confirmed"]
+        assert bird["distance"] == 4.0
+        assert bird["tcpa"] == float("inf")
+        assert _level(bird) == "EMERGENCY"
+
+
+def test_confirmed_track_reports_tcpa():
+    tracker = BirdTracker(dt=1.0)
+    for k in range(6):
+        tracker.step(np.array([[60.0 - 5.0 * k, 0.0]]))
+    bird = tracker.most_threatening()
+    assert bird["confirmed"]
+    assert 4.0 < bird["tcpa"] < 8.0
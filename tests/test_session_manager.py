@@ -0,0 +1,30 @@
+import time
+
+from session_manager import get_manager
+from vitals_alarms import AlarmEngine
+
+
+def _pinned_alarms(state):
+    if "alarm_engine" in state and state["alarm_engine"].active.any():
+        return ("alarm_engine", "alarm_log")
+    return ()
+
+
+def test_expired_module_keeps_unregistered_settings_and_pinned_alarms():
+    engine = AlarmEngine(n_patients=1)
+    engine.active[0, 0] = True
+    state = {"control_mode": "REMOTE", "logs": ["x"], "camera": object(),
+             "ecg_buffer": [0.0] * 10, "alarm_engine": engine, "alarm_log": ["RAISE"]}
+    manager = get_manager(state)
+    manager.register("Bird Avoidance", ["logs", "camera"], ttl_s=600)
+    manager.register("Vitals Monitoring", ["ecg_buffer", "alarm_engine", "alarm_log"], ttl_s=120, pin=_pinned_alarms)
+    manager.touch("Diagnostics")
+
+    manager.sweep(time.time() + 700)
+    assert state["control_mode"] == "REMOTE"
+    assert "camera" not in state and "ecg_buffer" not in state
+    assert state["alarm_engine"] is engine and state["alarm_log"] == ["RAISE"]
+
+    engine.active[:] = False
+    manager.sweep(time.time() + 700)
+    assert "alarm_engine" not in state and "alarm_log" not in state
@@ -0,0 +1,35 @@
+import numpy as np
+
+from vitals_alarms import AlarmEngine
+
+BASELINE = [[72.0, 97.0, 36.6]]
+
+
+def _run(signal, seconds, tick_s=0.15):
+    engine = AlarmEngine(n_patients=1)
+    events = []
+    for k in range(int(seconds / tick_s)):
+        t = k * tick_s
+        events += engine.evaluate(t, [signal(t)], baseline=BASELINE)
+    return events
+
+
+def test_steady_noisy_signal_raises_nothing():
+    rng = np.random.default_rng(0)
+    # Noise at the vitals.py simulator's per-second scale around a steady value
+    events = _run(lambda t: [72.0 + rng.normal(0, 2.0), 97.0 + rng.normal(0, 0.15), 36.6 + rng.normal(0, 0.01)],
+                  seconds=600)
+    assert events == []
+
+
+def test_rate_rule_needs_history_span():
+    # +0.01 degC in the first second is 0.6 degC/min when scaled up; must not alarm
+    events = _run(lambda t: [72.0, 97.0, 36.6 + (0.01 if t >= 1.0 else 0.0)], seconds=120)
+    assert events == []
+
+
+def test_sustained_temperature_climb_raises():
+    events = _run(lambda t: [72.0, 97.0, 36.6 + 0.3 * t / 60.0], seconds=180)
+    raised = [e for e in events if e["event"] == "RAISE"]
+    assert [e["rule"] for e in raised] == ["Temperature climbing"]
+    assert raised[0]["time"] >= 30 + 30   # half-window of history, then the on-delay
@@ -3,6 +3,44 @@ import streamlit as st
 import folium
 from streamlit_folium import st_folium
 import time
+from fleet import demo_fleet, flight_status, positions_geojson
+
+FLEET_SIZE = 200
+FLEET_UPDATE_S = 0.25
+
+
+# ------------------------------
+# Live fleet map (the drone layer is rebuilt and replaced whole each tick)
+# ------------------------------
+@st.fragment(run_every=FLEET_UPDATE_S)
+def show_fleet_map():
+    fleet = st.session_state.fleet
+    now = time.time()
+    drones = folium.FeatureGroup(name="Drones")
+    folium.GeoJson(
+        positions_geojson(fleet.ids, fleet.positions(now)),
+        marker=folium.CircleMarker(radius=4, color="black", fill=True, fill_opacity=0.9),
+    ).add_to(drones)
+    # Same base Map object every tick, so streamlit-folium keeps the base map and
+    # swaps in the whole drone layer (all FLEET_SIZE points; it has no per-feature update)
+    st_folium(st.session_state.fleet_map, feature_group_to_add=drones, key="fleet_map",
+              width=700, height=400, returned_objects=[])
+    st.subheader("Drone Flight Status")
+    st.text(f"Drone Status: {flight_status(fleet.progress(now)[0])}")
+
+
+def init_fleet(start, patient, end):
+    """Create the fleet and its static base map once per session"""
+    if "fleet" in st.session_state:
+        return
+    m = folium.Map(location=start, zoom_start=14)
+    folium.Marker(start, tooltip="Drone Base", icon=folium.Icon(color="green")).add_to(m)
+    folium.Marker(patient, tooltip="Patient", icon=folium.Icon(color="red")).add_to(m)
+    folium.Marker(end, tooltip="Return Base", icon=folium.Icon(color="blue")).add_to(m)
+    folium.PolyLine([start, patient, end], color="purple", weight=5, opacity=0.8).add_to(m)
+    st.session_state.fleet_map = m
+    st.session_state.fleet = demo_fleet(start, n_drones=FLEET_SIZE, t0=time.time(),
+                                        first_route=[start, patient, end])
 
 # ------------------------------
 # Function: AI Triage Simulation
@@ -26,26 +64,9 @@ def show_triage():
     patient = [12.9750, 77.6050]    # Patient location
     end = [12.9716, 77.5946]        # Return to base
 
-    # Create folium map
-    m = folium.Map(location=start, zoom_start=14)
-    folium.Marker(start, tooltip="Drone Base", icon=folium.Icon(color="green")).add_to(m)
-    folium.Marker(patient, tooltip="Patient", icon=folium.Icon(color="red")).add_to(m)
-    folium.Marker(end, tooltip="Return Base", icon=folium.Icon(color="blue")).add_to(m)
-
-    # Draw route
-    folium.PolyLine([start, patient, end], color="purple", weight=5, opacity=0.8).add_to(m)
-
-    st_folium(m, width=700, height=400)
-
-    # Fake flight steps animation
-    st.subheader("Drone Flight Status")
-    steps = ["Taking Off", "En Route", "Delivered", "Returning"]
-    status_text = st.empty()
-
-    for step in steps:
-        status_text.text(f"Drone Status: {step}")
-        time.sleep(1.5)
-    status_text.text("Drone Status: Completed ✅")
+    # Live map: patient drone plus the rest of the fleet, interpolated along their routes
+    init_fleet(start, patient, end)
+    show_fleet_map()
 
 
 # --------------------------------------
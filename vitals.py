@@ -4,6 +4,8 @@ Streamlit-friendly Biosensor Vitals Simulator
 - ECG waveform (synthetic)
 - SpO₂ values (random)
 - Body temperature values (random)
+- Streaming band-pass / notch filtering of the ECG (state carried across reruns)
+- Threshold / baseline-drift / rate-of-change alarms with hysteresis
 - Real-time plotting without blocking loops
 """
 
@@ -16,6 +18,8 @@ import math
 import random
 import plotly.graph_objects as go
 from streamlit_autorefresh import st_autorefresh
+from ecg_filter import NOTCH_OPTIONS, cached_filter
+from vitals_alarms import AlarmEngine
 
 # -------------------------
 # Helper functions
@@ -76,6 +80,9 @@ with col_ctrl:
     beat_jitter = st.slider("Beat interval jitter (±fraction)", 0.0, 0.1, 0.02, step=0.005)
     spo2_baseline = st.slider("SpO₂ baseline (%)", 85, 100, 97)
     temp_baseline = st.slider("Body temp baseline (°C)", 35.0, 39.0, 36.6, step=0.1)
+    filter_ecg = st.checkbox("Filter ECG", value=True)
+    filter_band = st.slider("ECG band-pass (Hz)", 0.1, 60.0, (0.5, 40.0), step=0.1)
+    notch = st.selectbox("Mains notch", list(NOTCH_OPTIONS), index=1)
     run_sim = st.checkbox("Run simulation", value=True)
 
 with col_display:
@@ -87,6 +94,7 @@ with col_display:
     spo2_metric = metric_col1.empty()
     temp_metric = metric_col2.empty()
     hr_metric = metric_col3.empty()
+    alarm_placeholder = st.container()
 
 # -------------------------
 # Initialize buffers
@@ -111,6 +119,12 @@ if st.session_state.ecg_buffer.maxlen != expected_len:
 if run_sim:
     chunk_duration = 0.15
     _, ecg_chunk = generate_ecg_chunk(hr, chunk_duration, fs, beat_template, noise_level, beat_jitter)
+    if filter_ecg:
+        band_filter = cached_filter(st.session_state, "vitals_ecg_filter", fs, filter_band, NOTCH_OPTIONS[notch])
+        if band_filter is None:
+            st.warning(f"ECG band {filter_band[0]}–{filter_band[1]} Hz is not usable at {fs} Hz sampling; showing unfiltered ECG.")
+        else:
+            ecg_chunk = band_filter.process(ecg_chunk)
     for s in ecg_chunk:
         st.session_state.ecg_buffer.append(s)
     last_time = st.session_state.time_buffer[-1] if st.session_state.time_buffer else 0.0
@@ -165,3 +179,21 @@ temp_placeholder.plotly_chart(fig_temp, use_container_width=True)
 spo2_metric.metric("SpO₂ (%)", f"{st.session_state.spo2_buffer[-1]:.1f}")
 temp_metric.metric("Temp (°C)", f"{st.session_state.temp_buffer[-1]:.2f}")
 hr_metric.metric("HR (bpm)", f"{hr}")
+
+# -------------------------
+# Alarms
+# -------------------------
+if "alarm_engine" not in st.session_state:
+    st.session_state.alarm_engine = AlarmEngine(n_patients=1)
+    st.session_state.alarm_log = deque(maxlen=20)
+latest = [[hr, st.session_state.spo2_buffer[-1], st.session_state.temp_buffer[-1]]]
+events = st.session_state.alarm_engine.evaluate(time.time(), latest, baseline=[[hr, spo2_baseline, temp_baseline]])
+for e in events:
+    st.session_state.alarm_log.append(f"[{time.strftime('%H:%M:%S')}] {e['event']} {e['rule']} ({e['value']})")
+    if e["event"] == "RAISE":
+        st.toast(f"🚨 {e['rule']} ({e['value']})")
+with alarm_placeholder:
+    for name, severity in st.session_state.alarm_engine.active_alarms(0):
+        (st.error if severity == "critical" else st.warning)(f"🚨 {name}")
+    for entry in reversed(st.session_state.alarm_log):
+        st.caption(entry)
@@ -0,0 +1,165 @@
+# vitals_alarms.py
+"""
+Vectorized multi-patient vitals alarm engine
+- Rules: absolute level, drift from a per-patient baseline, and rate of change
+- Hysteresis (separate clear level) and debounce (on/off delays) per rule
+- All patients x all rules evaluated per tick as (P, R) NumPy array operations
+- Emits deduplicated RAISE / CLEAR events: an alarm fires once until it clears
+"""
+
+import numpy as np
+
+SIGNALS = ("hr", "spo2", "temp")
+
+# kind: "level" (value), "baseline" (value - baseline), "rate" (change per minute over window_s;
+# undefined until the history spans at least min_span_frac of the window)
+DEFAULT_RULES = [
+    {"name": "Tachycardia", "signal": "hr", "kind": "level", "op": ">", "threshold": 120, "hysteresis": 5, "on_delay_s": 5, "severity": "warning"},
+    {"name": "Bradycardia", "signal": "hr", "kind": "level", "op": "<", "threshold": 45, "hysteresis": 3, "on_delay_s": 5, "severity": "warning"},
+    {"name": "Severe tachycardia", "signal": "hr", "kind": "level", "op": ">", "threshold": 140, "hysteresis": 5, "on_delay_s": 2, "severity": "critical"},
+    {"name": "HR rising fast", "signal": "hr", "kind": "rate", "op": ">", "threshold": 20, "hysteresis": 5, "window_s": 30, "on_delay_s": 10, "severity": "warning"},
+    {"name": "SpO₂ low", "signal": "spo2", "kind": "level", "op": "<", "threshold": 92, "hysteresis": 1, "on_delay_s": 10, "severity": "warning"},
+    {"name": "SpO₂ critical", "signal": "spo2", "kind": "level", "op": "<", "threshold": 88, "hysteresis": 1, "on_delay_s": 3, "severity": "critical"},
+    {"name": "SpO₂ below baseline", "signal": "spo2", "kind": "baseline", "op": "<", "threshold": -3, "hysteresis": 1, "on_delay_s": 15, "severity": "warning"},
+    {"name": "Fever", "signal": "temp", "kind": "level", "op": ">", "threshold": 38.0, "hysteresis": 0.2, "on_delay_s": 30, "severity": "warning"},
+    {"name": "Hypothermia", "signal": "temp", "kind": "level", "op": "<", "threshold": 35.5, "hysteresis": 0.2, "on_delay_s": 30, "severity": "warning"},
+    {"name": "Temperature climbing", "signal": "temp", "kind": "rate", "op": ">", "threshold": 0.1, "hysteresis": 0.03, "window_s": 60, "on_delay_s": 30, "severity": "warning"},
+]
+
+
+class AlarmEngine:
+    """Per-(patient, rule) alarm state machines, advanced together each tick"""
+
+    def __init__(self, n_patients, rules=DEFAULT_RULES, signals=SIGNALS, history_len=128, history_step_s=1.0,
+                 min_span_frac=0.5):
+        self.n_patients = n_patients
+        self.rules = list(rules)
+        self.signals = list(signals)
+        r = self.rules
+        self.sig = np.array([self.signals.index(x["signal"]) for x in r])
+        self.sign = np.array([1.0 if x["op"] == ">" else -1.0 for x in r])
+        self.threshold = np.array([float(x["threshold"]) for x in r])
+        # Clear level sits on the safe side of the threshold by the hysteresis margin
+        self.clear_level = self.threshold - self.sign * np.array([float(x.get("hysteresis", 0.0)) for x in r])
+        self.on_delay = np.array([float(x.get("on_delay_s", 0.0)) for x in r])
+        self.off_delay = np.array([float(x.get("off_delay_s", 0.0)) for x in r])
+        kinds = np.array([x["kind"] for x in r])
+        self.is_rate = kinds == "rate"
+        self.is_baseline = kinds == "baseline"
+        self.window = np.array([float(x.get("window_s", 60.0)) for x in r])
+        self.rate_cols = np.flatnonzero(self.is_rate)
+        # A rate from a second or two of history is mostly noise scaled up to per-minute
+        self.min_span = self.window[self.rate_cols] * min_span_frac
+
+        shape = (n_patients, len(r))
+        self.active = np.zeros(shape, dtype=bool)
+        self.pending_since = np.full(shape, np.nan)
+        self.clearing_since = np.full(shape, np.nan)
+
+        # Coarse history ring (one sample per history_step_s) for rate-of-change rules
+        self.history = np.full((history_len, n_patients, len(self.signals)), np.nan)
+        self.history_t = np.full(history_len, -np.inf)
+        self.history_step = history_step_s
+        self._head = 0
+
+    def _record(self, t, values):
+        last_t = self.history_t[(self._head - 1) % len(self.history_t)]
+        if t - last_t >= self.history_step:
+            self.history[self._head] = values
+            self.history_t[self._head] = t
+            self._head = (self._head + 1) % len(self.history_t)
+
+    def _metric(self, t, values, baseline):
+        """(P, R) matrix of the quantity each rule compares against its threshold"""
+        metric = values[:, self.sig]
+        if baseline is not None and self.is_baseline.any():
+            metric[:, self.is_baseline] -= np.asarray(baseline, dtype=float)[:, self.sig[self.is_baseline]]
+        if len(self.rate_cols):
+            # Oldest recorded sample still inside each rule's window
+            age = t - self.history_t                               # (H,)
+            in_window = (age[:, None] <= self.window[self.rate_cols][None, :]) & np.isfinite(age)[:, None]
+            lag = np.where(in_window, age[:, None], -np.inf).argmax(axis=0)   # (Rr,)
+            dt = age[lag]
+            sig = self.sig[self.rate_cols]
+            past = self.history[lag[None, :], np.arange(self.n_patients)[:, None], sig[None, :]]
+            with np.errstate(invalid="ignore", divide="ignore"):
+                rate = (values[:, sig] - past) / dt * 60.0
+            rate[:, ~(in_window.any(axis=0) & (dt > 0) & (dt >= self.min_span))] = np.nan
+            metric[:, self.rate_cols] = rate
+        return metric
+
+    def evaluate(self, t, values, baseline=None):
+        """Advance all alarms to time t; values is (P, n_signals). Returns new RAISE/CLEAR events"""
+        values = np.asarray(values, dtype=float).reshape(self.n_patients, len(self.signals))
+        metric = self._metric(t, values, baseline)
+        self._record(t, values)
+
+        with np.errstate(invalid="ignore"):
+            signed = metric * self.sign
+            tripped = signed > self.threshold * self.sign
+            recovered = signed < self.clear_level * self.sign   # NaN compares False: no change
+
+        # Debounce: a condition must hold continuously for on/off delay before state flips
+        self.pending_since = np.where(tripped & ~self.active,
+                                      np.where(np.isnan(self.pending_since), t, self.pending_since), np.nan)
+        self.clearing_since = np.where(recovered & self.active,
+                                       np.where(np.isnan(self.clearing_since), t, self.clearing_since), np.nan)
+        raised = ~self.active & (t - self.pending_since >= self.on_delay)
+        cleared = self.active & (t - self.clearing_since >= self.off_delay)
+        self.active = (self.active | raised) & ~cleared
+        self.pending_since[raised] = np.nan
+        self.clearing_since[cleared] = np.nan
+        return self._events(t, raised, cleared, metric)
+
+    def _events(self, t, raised, cleared, metric):
+        events = []
+        for kind, mask in (("RAISE", raised), ("CLEAR", cleared)):
+            for p, r in zip(*np.nonzero(mask)):
+                rule = self.rules[r]
+                events.append({"time": t, "patient": int(p), "rule": rule["name"], "event": kind,
+                               "severity": rule["severity"], "value": round(float(metric[p, r]), 2)})
+        return events
+
+    def active_alarms(self, patient):
+        """Names and severities of alarms currently active for one patient"""
+        return [(self.rules[r]["name"], self.rules[r]["severity"]) for r in np.flatnonzero(self.active[patient])]
+
+
+def make_rule_set(n_rules):
+    """Repeat DEFAULT_RULES with nudged thresholds to get a rule set of the requested size"""
+    rules = []
+    for i in range(n_rules):
+        base = dict(DEFAULT_RULES[i % len(DEFAULT_RULES)])
+        base["name"] = f"{base['name']} #{i}"
+        base["threshold"] = base["threshold"] * (1.0 + 0.01 * (i // len(DEFAULT_RULES)))
+        rules.append(base)
+    return rules
+
+
+def run_benchmark(n_patients=5000, n_rules=20, ticks=200, seed=0):
+    """Mean evaluation time per tick for n_patients x n_rules"""
+    import time
+
+    rng = np.random.default_rng(seed)
+    engine = AlarmEngine(n_patients, make_rule_set(n_rules))
+    baseline = np.tile([75.0, 97.0, 36.8], (n_patients, 1))
+    values = baseline.copy()
+    elapsed, n_events = 0.0, 0
+    for tick in range(ticks):
+        values += rng.normal(0, [2.0, 0.3, 0.02], size=values.shape)
+        start = time.perf_counter()
+        n_events += len(engine.evaluate(tick * 1.0, values, baseline))
+        elapsed += time.perf_counter() - start
+    return {"patients": n_patients, "rules": n_rules, "ms_per_tick": round(elapsed / ticks * 1e3, 3),
+            "events": n_events}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark the vitals alarm engine")
+    parser.add_argument("--patients", type=int, default=5000)
+    parser.add_argument("--rules", type=int, default=20)
+    args = parser.parse_args()
+    for key, value in run_benchmark(args.patients, args.rules).items():
+        print(f"{key:>12}: {value}")